@@ -1,17 +1,17 @@
 from flask import Flask, request, jsonify, render_template, Response
 import cv2
-import numpy as np
 import os
-import io
-import base64
-from PIL import Image
 import threading
 import time
 from violence_detector import ViolenceDetector
+from results_store import LiveResultsStore
+from detection_utils import annotate_frame, decode_image, query_violent_intervals
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
+app.config['LIVE_RESULTS_CAPACITY'] = 100
+app.config['LIVE_RESULTS_LOG'] = os.environ.get('LIVE_RESULTS_LOG')  # Directory for on-disk history
 
 # Initialize violence detector
 detector = ViolenceDetector()
@@ -19,7 +19,10 @@ detector = ViolenceDetector()
 # Global variables for live video
 camera = None
 live_detection_active = False
-live_detection_results = []
+live_detection_results = LiveResultsStore(
+    capacity=app.config['LIVE_RESULTS_CAPACITY'],
+    log_dir=app.config['LIVE_RESULTS_LOG']
+)
 
 class VideoCamera:
     def __init__(self):
@@ -45,22 +48,7 @@ class VideoCamera:
         is_violent, confidence = detector.detect_violence(frame)
         
         # Draw detection results on frame
-        color = (0, 0, 255) if is_violent else (0, 255, 0)
-        status = "VIOLENCE DETECTED!" if is_violent else "Safe"
-        
-        cv2.putText(frame, f"Status: {status}", (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
-        cv2.putText(frame, f"Confidence: {confidence:.2f}", (10, 70), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-        
-        # Add timestamp
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        cv2.putText(frame, timestamp, (10, frame.shape[0] - 10), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # Encode frame to JPEG
-        ret, jpeg = cv2.imencode('.jpg', frame)
-        return jpeg.tobytes(), is_violent, confidence
+        return annotate_frame(frame, is_violent, confidence), is_violent, confidence
 
 @app.route('/')
 def index():
@@ -88,16 +76,9 @@ def generate_frames():
                 
             frame_bytes, is_violent, confidence = result
             
-            # Store detection result
-            live_detection_results.append({
-                'timestamp': time.time(),
-                'is_violent': is_violent,
-                'confidence': confidence
-            })
-            
-            # Keep only last 100 results
-            if len(live_detection_results) > 100:
-                live_detection_results = live_detection_results[-100:]
+            # Store detection result (ring keeps the last
+            # LIVE_RESULTS_CAPACITY results, older ones go to the log)
+            live_detection_results.append(time.time(), is_violent, confidence)
             
             yield (b'--frame\r\n'
                    b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
@@ -116,7 +97,8 @@ def video_feed():
 def start_live_detection():
     global live_detection_active, live_detection_results
     live_detection_active = True
-    live_detection_results = []
+    live_detection_results.clear()
+    detector.reset_temporal_state()
     return jsonify({'status': 'started'})
 
 @app.route('/stop_live_detection', methods=['POST'])
@@ -132,10 +114,18 @@ def stop_live_detection():
 def get_live_results():
     global live_detection_results
     return jsonify({
-        'results': live_detection_results[-10:],  # Last 10 results
-        'total_detections': len([r for r in live_detection_results if r['is_violent']])
+        'results': live_detection_results.latest(10),  # Last 10 results
+        'total_detections': live_detection_results.violent_count
     })
 
+@app.route('/get_violent_intervals')
+def get_violent_intervals():
+    try:
+        return jsonify(query_violent_intervals(live_detection_results, request.args))
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/upload_video', methods=['POST'])
 def upload_video():
     try:
@@ -170,12 +160,9 @@ def upload_video():
 def analyze_frame():
     try:
         data = request.get_json()
-        image_data = data['image'].split(',')[1]  # Remove data:image/jpeg;base64,
         
         # Decode base64 image
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        frame = decode_image(data['image'])
         
         # Detect violence
         is_violent, confidence = detector.detect_violence(frame)
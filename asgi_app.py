@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Production Serving Mode (ASGI)
+
+Serves the same pages and API as app.py from an asyncio front end (Quart on
+Hypercorn). HTTP handling, MJPEG streaming and result streaming stay on the
+event loop, while detect_violence and video analysis run in an
+InferencePool of worker processes that each hold the model. Frames reach
+the workers through shared memory.
+
+Usage:
+    python asgi_app.py [--host 127.0.0.1] [--port 5000] [--workers N] [--video-workers N]
+
+Or with any ASGI server:
+    hypercorn asgi_app:app
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+from quart import Quart, Response, jsonify, render_template, request
+
+from detection_utils import annotate_frame, decode_image, query_violent_intervals
+from frame_ring import FrameRing
+from inference_pool import InferencePool
+from results_store import LiveResultsStore
+
+app = Quart(__name__)
+app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
+app.config['BODY_TIMEOUT'] = 600  # Large uploads on slow links
+app.config['LIVE_RESULTS_CAPACITY'] = 100
+app.config['LIVE_RESULTS_LOG'] = os.environ.get('LIVE_RESULTS_LOG')  # Directory for on-disk history
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('INFERENCE_WORKERS', 0)) or None
+app.config['VIDEO_WORKERS'] = int(os.environ.get('VIDEO_WORKERS', 1))
+
+pool = None
+camera = None
+live_detection_active = False
+live_detection_results = LiveResultsStore(
+    capacity=app.config['LIVE_RESULTS_CAPACITY'],
+    log_dir=app.config['LIVE_RESULTS_LOG']
+)
+live_results_event = asyncio.Event()
+
+
+@app.before_serving
+async def start_pool():
+    global pool
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    pool = InferencePool(app.config['INFERENCE_WORKERS'],
+                         video_workers=app.config['VIDEO_WORKERS'])
+    await pool.start()
+    print(f"Inference pool ready with {pool.workers} frame and "
+          f"{pool.video_workers} video worker processes")
+
+
+@app.after_serving
+async def stop_pool():
+    global camera
+    if camera is not None:
+        camera.release()
+        camera = None
+    pool.close()
+    live_detection_results.close()
+
+
+class CameraCapture:
+    """Capture thread that decodes camera frames straight into a FrameRing.
+
+    Capture never waits for detection: when inference falls behind, the
+    oldest frames are overwritten and the detector moves on to the newest.
+    """
+
+    def __init__(self, slots=8):
+        self.video = cv2.VideoCapture(0)
+        self.video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        self.video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
+        success, frame = self.video.read()
+        if not success:
+            self.video.release()
+            raise RuntimeError("Camera not available")
+        self.ring = FrameRing(slots, frame.shape)
+        self.ring.write(frame)
+
+        self.running = True
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def _capture(self):
+        while self.running:
+            seq, view = self.ring.begin_write()
+            success, image = self.video.read(view)  # Decodes in place when shapes match
+            if not success:
+                self.running = False
+                break
+            if not np.shares_memory(image, view):
+                cv2.resize(image, (view.shape[1], view.shape[0]), dst=view)
+            self.ring.commit(seq)
+
+    def release(self):
+        self.running = False
+        self._thread.join()
+        self.video.release()
+        self.ring.close()
+
+
+@app.route('/')
+async def index():
+    return await render_template('index.html')
+
+
+@app.route('/live-detection')
+async def live_detection():
+    return await render_template('live_detection.html')
+
+
+@app.route('/upload-detection')
+async def upload_detection():
+    return await render_template('upload_detection.html')
+
+
+async def generate_frames():
+    global camera
+
+    if camera is None:
+        camera = await asyncio.to_thread(CameraCapture)
+
+    last_seq = 0
+    try:
+        while live_detection_active and camera.running:
+            seq = camera.ring.last_seq
+            if seq == last_seq:
+                await asyncio.sleep(0.005)  # Wait for the next captured frame
+                continue
+            last_seq = seq
+
+            # The worker reads the frame out of the ring in place
+            result = await pool.detect_in_ring(camera.ring, seq, stream_id='camera')
+            frame = camera.ring.get(seq)
+            if result is None or frame is None:
+                continue  # Overwritten while being analysed, move to the newest frame
+            frame = frame.copy()  # Annotate a private copy, capture keeps writing
+            if not camera.ring.is_current(seq):
+                continue
+
+            is_violent, confidence = result
+            # JPEG encoding releases the GIL
+            frame_bytes = await asyncio.to_thread(annotate_frame, frame, is_violent, confidence)
+
+            live_detection_results.append(time.time(), is_violent, confidence)
+            live_results_event.set()
+
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    except Exception as e:
+        print(f"Error in frame generation: {e}")
+    finally:
+        # The stream owns the camera; stopping or disconnecting releases it
+        frame = None  # Drop any view into the ring before it is closed
+        if camera is not None:
+            await asyncio.to_thread(camera.release)
+            camera = None
+
+
+@app.route('/video_feed')
+async def video_feed():
+    global live_detection_active
+    live_detection_active = True
+    response = Response(generate_frames(),
+                        mimetype='multipart/x-mixed-replace; boundary=frame')
+    response.timeout = None  # Stream for as long as the client watches
+    return response
+
+
+@app.route('/start_live_detection', methods=['POST'])
+async def start_live_detection():
+    global live_detection_active
+    live_detection_active = True
+    live_detection_results.clear()
+    await pool.reset_stream('camera')
+    return jsonify({'status': 'started'})
+
+
+@app.route('/stop_live_detection', methods=['POST'])
+async def stop_live_detection():
+    global live_detection_active
+    live_detection_active = False  # generate_frames releases the camera
+    return jsonify({'status': 'stopped'})
+
+
+@app.route('/get_live_results')
+async def get_live_results():
+    return jsonify({
+        'results': live_detection_results.latest(10),  # Last 10 results
+        'total_detections': live_detection_results.violent_count
+    })
+
+
+@app.route('/live_results_stream')
+async def live_results_stream():
+    """Push each new live result to the client as a server-sent event"""
+    async def events():
+        last_count = live_detection_results.total_count
+        while True:
+            await live_results_event.wait()
+            live_results_event.clear()
+
+            new_count = live_detection_results.total_count
+            for result in live_detection_results.latest(new_count - last_count):
+                yield f"data: {json.dumps(result)}\n\n".encode()
+            last_count = new_count
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.timeout = None
+    return response
+
+
+@app.route('/get_violent_intervals')
+async def get_violent_intervals():
+    try:
+        # Reading the on-disk log can block, keep it off the event loop
+        return jsonify(await asyncio.to_thread(
+            query_violent_intervals, live_detection_results, request.args))
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/upload_video', methods=['POST'])
+async def upload_video():
+    try:
+        files = await request.files
+        if 'video' not in files:
+            return jsonify({'error': 'No video file provided'}), 400
+
+        file = files['video']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        # Save uploaded file
+        filename = f"video_{int(time.time())}_{file.filename}"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        await file.save(filepath)
+
+        try:
+            # Process video for violence detection in a worker process
+            results = await pool.analyze_video(filepath)
+        finally:
+            # Clean up uploaded file
+            os.remove(filepath)
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            'filename': file.filename
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/analyze_frame', methods=['POST'])
+async def analyze_frame():
+    try:
+        data = await request.get_json()
+        frame = await asyncio.to_thread(decode_image, data['image'])
+
+        # Each client keeps its own motion history; clients sharing an
+        # address (NAT, proxy) can tell their streams apart with stream_id
+        stream_id = data.get('stream_id') or request.remote_addr
+        is_violent, confidence = await pool.detect(frame, stream_id=stream_id)
+
+        return jsonify({
+            'is_violent': is_violent,
+            'confidence': confidence,
+            'timestamp': time.time()
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def main():
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    parser = argparse.ArgumentParser(description="Serve the violence detection app over ASGI")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=5000, help="Port to listen on (default: 5000)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Inference worker processes (default: CPU count)")
+    parser.add_argument('--video-workers', type=int, default=None,
+                        help="Processes for uploaded video analysis (default: 1)")
+    args = parser.parse_args()
+
+    if args.workers:
+        app.config['INFERENCE_WORKERS'] = args.workers
+    if args.video_workers:
+        app.config['VIDEO_WORKERS'] = args.video_workers
+
+    config = Config()
+    config.bind = [f"{args.host}:{args.port}"]
+    asyncio.run(serve(app, config))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Batch Scan Recorded Footage for Violence
+
+Walks a directory tree and analyses every video file with a pool of worker
+processes, each holding its own copy of the model. Results are written as
+each file completes, so an interrupted scan keeps everything finished so far.
+
+Output directory contents:
+output_dir/
+├── results.jsonl   (full result per video, one JSON object per line)
+├── results.csv     (one summary row per video)
+└── manifest.jsonl  (scanned files, used to skip them on re-runs)
+
+Files that fail to open or decode are recorded in the manifest as well and
+are not retried until they change on disk. With --retry-failed they are
+scanned again and get another row in results.jsonl/results.csv; the last
+row for a path is the current one.
+
+Usage:
+    python batch_scan.py <footage_dir> [--output scan_results] [--workers N] [--retry-failed]
+
+Example:
+    python batch_scan.py /mnt/archive/2024 --output scan_2024 --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import cv2
+from violence_detector import ViolenceDetector
+
+CSV_FIELDS = [
+    'path', 'status', 'total_frames', 'analyzed_frames', 'violent_frames',
+    'violence_percentage', 'is_violent_video', 'elapsed', 'error'
+]
+
+# Per-process detector, created once by the pool initializer
+_detector = None
+
+
+def _init_worker():
+    global _detector
+    # One OpenCV thread per process, the pool already uses every core
+    cv2.setNumThreads(1)
+    _detector = ViolenceDetector()
+    _detector.debug = False
+
+
+def _file_key(path):
+    """Identity of a file for the manifest (path, size and mtime)"""
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _scan_video(path):
+    """Analyse one video in a worker process"""
+    start = time.time()
+    result = {'path': path, 'bytes': 0, 'mtime': None}
+    try:
+        # Unreadable files and broken symlinks fail here, not in the parent
+        key = _file_key(path)
+        result['bytes'], result['mtime'] = key['size'], key['mtime']
+        result.update(_detector.detect_violence_in_video(path))
+        if result['total_frames'] == 0:
+            result['status'] = 'error'
+            result['error'] = 'No frames could be decoded'
+        else:
+            result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['elapsed'] = time.time() - start
+    return result
+
+
+def load_manifest(manifest_path):
+    """Return {path: (size, mtime, status)} for files scanned by earlier runs"""
+    done = {}
+    if not os.path.exists(manifest_path):
+        return done
+
+    with open(manifest_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line from a killed run
+            done[entry['path']] = (entry['size'], entry['mtime'], entry.get('status', 'ok'))
+    return done
+
+
+def pending_videos(footage_dir, done, retry_failed=False):
+    """Video files under footage_dir that are new or changed since last run"""
+    pending = []
+    for path in sorted(ViolenceDetector._get_video_files_recursive(footage_dir)):
+        try:
+            key = _file_key(path)
+            current = (key['size'], key['mtime'])
+        except OSError:
+            current = (None, None)  # Broken symlink etc., the worker records the error
+
+        entry = done.get(path)
+        if entry is None or entry[:2] != current or (retry_failed and entry[2] == 'error'):
+            pending.append(path)
+    return pending
+
+
+def scan(footage_dir, output_dir, workers=None, chunksize=1, retry_failed=False):
+    os.makedirs(output_dir, exist_ok=True)
+    jsonl_path = os.path.join(output_dir, 'results.jsonl')
+    csv_path = os.path.join(output_dir, 'results.csv')
+    manifest_path = os.path.join(output_dir, 'manifest.jsonl')
+
+    done = load_manifest(manifest_path)
+    videos = pending_videos(footage_dir, done, retry_failed)
+    workers = workers or os.cpu_count()
+
+    print(f"Found {len(videos)} videos to scan ({len(done)} already done)")
+    print(f"Using {workers} worker processes")
+    if not videos:
+        return
+
+    # Load (or train, on first run) the model once here, so the workers
+    # only ever load it instead of each training and writing models/
+    ViolenceDetector()
+
+    write_header = not os.path.exists(csv_path)
+    stats = {'ok': 0, 'error': 0, 'frames': 0, 'analyzed': 0, 'bytes': 0, 'violent': 0}
+    start = time.time()
+
+    with open(jsonl_path, 'a') as jsonl_file, \
+            open(csv_path, 'a', newline='') as csv_file, \
+            open(manifest_path, 'a') as manifest_file, \
+            Pool(workers, initializer=_init_worker) as pool:
+        writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        if write_header:
+            writer.writeheader()
+
+        for i, result in enumerate(pool.imap_unordered(_scan_video, videos, chunksize)):
+            jsonl_file.write(json.dumps(result) + '\n')
+            writer.writerow(result)
+            jsonl_file.flush()
+            csv_file.flush()
+
+            stats[result['status']] += 1
+            stats['bytes'] += result['bytes']
+            if result['status'] == 'ok':
+                stats['frames'] += result['total_frames']
+                stats['analyzed'] += result['analyzed_frames']
+                stats['violent'] += int(result['is_violent_video'])
+
+            # Failed files are skipped next time too, unless they change
+            manifest_file.write(json.dumps({
+                'path': result['path'],
+                'size': result['bytes'] if result['mtime'] is not None else None,
+                'mtime': result['mtime'],
+                'status': result['status']
+            }) + '\n')
+            manifest_file.flush()
+
+            flag = "⚠️ " if result.get('is_violent_video') else ""
+            print(f"[{i + 1}/{len(videos)}] {flag}{result['status']}: {result['path']} "
+                  f"({result['elapsed']:.1f}s)")
+
+    elapsed = time.time() - start
+    print("\n📊 Scan summary")
+    print(f"   Files scanned:    {stats['ok']} ok, {stats['error']} failed")
+    print(f"   Violent videos:   {stats['violent']}")
+    print(f"   Frames decoded:   {stats['frames']} ({stats['analyzed']} analysed)")
+    print(f"   Elapsed:          {elapsed:.1f}s")
+    if elapsed > 0:
+        print(f"   Throughput:       {len(videos) / elapsed:.2f} files/s, "
+              f"{stats['frames'] / elapsed:.1f} frames/s, "
+              f"{stats['bytes'] / elapsed / 1024 / 1024:.1f} MB/s")
+    print(f"   Results written to: {output_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan a directory of videos for violence")
+    parser.add_argument('footage_dir', help="Directory tree containing video files")
+    parser.add_argument('--output', default='scan_results',
+                        help="Directory for results and manifest (default: scan_results)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=1,
+                        help="Videos handed to a worker at a time (default: 1)")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="Scan files that failed in earlier runs again")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.footage_dir):
+        print(f"Error: Footage directory '{args.footage_dir}' does not exist!")
+        sys.exit(1)
+
+    scan(args.footage_dir, args.output, args.workers, args.chunksize, args.retry_failed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import base64
+import io
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Helpers shared by the Flask app (app.py) and the ASGI app (asgi_app.py)
+
+
+def annotate_frame(frame, is_violent, confidence):
+    """Draw detection results on frame and encode it to JPEG bytes"""
+    color = (0, 0, 255) if is_violent else (0, 255, 0)
+    status = "VIOLENCE DETECTED!" if is_violent else "Safe"
+
+    cv2.putText(frame, f"Status: {status}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+    cv2.putText(frame, f"Confidence: {confidence:.2f}", (10, 70),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+    # Add timestamp
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    cv2.putText(frame, timestamp, (10, frame.shape[0] - 10),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    # Encode frame to JPEG
+    ret, jpeg = cv2.imencode('.jpg', frame)
+    return jpeg.tobytes()
+
+
+def decode_image(data_url):
+    """BGR frame from a base64 data URL sent by the browser"""
+    image_data = data_url.split(',')[1]  # Remove data:image/jpeg;base64,
+    image_bytes = base64.b64decode(image_data)
+    image = Image.open(io.BytesIO(image_bytes))
+    return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+
+
+def query_violent_intervals(store, args):
+    """Answer a /get_violent_intervals request from its query arguments"""
+    start = args.get('start', type=float)
+    end = args.get('end', type=float)
+    max_gap = args.get('max_gap', default=1.0, type=float)
+
+    return {
+        'intervals': store.violent_intervals(start, end, max_gap),
+        'start': start,
+        'end': end
+    }
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class EventBuilder:
+    """Fold a stream of per-frame detections into violent intervals.
+
+    Consecutive violent samples closer than ``max_gap`` seconds are merged
+    into one event. Only the currently open event is held in memory, so the
+    cost is independent of video length; closed events are appended to
+    ``events``.
+    """
+
+    def __init__(self, max_gap=1.0, min_samples=1):
+        self.max_gap = max_gap
+        self.min_samples = min_samples
+        self.events = []
+        self._open = None
+
+    def update(self, timestamp, is_violent, confidence):
+        if self._open is not None and timestamp - self._open['end'] > self.max_gap:
+            self._close()
+
+        if not is_violent:
+            return
+
+        if self._open is None:
+            self._open = {
+                'start': timestamp,
+                'end': timestamp,
+                'peak_confidence': confidence,
+                'confidence_sum': confidence,
+                'samples': 1
+            }
+        else:
+            self._open['end'] = timestamp
+            self._open['peak_confidence'] = max(self._open['peak_confidence'], confidence)
+            self._open['confidence_sum'] += confidence
+            self._open['samples'] += 1
+
+    def _close(self):
+        event = self._open
+        self._open = None
+        if event['samples'] < self.min_samples:
+            return
+
+        self.events.append({
+            'start': float(event['start']),
+            'end': float(event['end']),
+            'peak_confidence': float(event['peak_confidence']),
+            'mean_confidence': float(event['confidence_sum'] / event['samples']),
+            'samples': event['samples']
+        })
+
+    def finish(self):
+        """Close any open event and return the full event list"""
+        if self._open is not None:
+            self._close()
+        return self.events
+
+
+class ConfidenceCurve:
+    """Fixed-size downsampled confidence curve of unknown length.
+
+    Samples are accumulated into at most ``max_points`` buckets. Whenever
+    the buckets fill up, neighbouring pairs are merged and the bucket width
+    doubles, so memory stays constant however long the video is.
+    """
+
+    def __init__(self, max_points=256):
+        self.max_points = max_points - max_points % 2
+        self.width = 1  # Samples per bucket
+        self.sums = np.zeros(self.max_points)
+        self.peaks = np.zeros(self.max_points)
+        self.starts = np.zeros(self.max_points)
+        self.counts = np.zeros(self.max_points, dtype=np.int64)
+        self._n = 0  # Buckets in use
+
+    def add(self, timestamp, confidence):
+        i = self._n - 1
+        if i < 0 or self.counts[i] >= self.width:
+            if self._n == self.max_points:
+                self._compact()
+            i = self._n
+            self._n += 1
+            self.starts[i] = timestamp
+            self.sums[i] = 0
+            self.peaks[i] = confidence
+            self.counts[i] = 0
+
+        self.sums[i] += confidence
+        self.peaks[i] = max(self.peaks[i], confidence)
+        self.counts[i] += 1
+
+    def _compact(self):
+        half = self._n // 2
+        self.sums[:half] = self.sums[0:self._n:2] + self.sums[1:self._n:2]
+        self.peaks[:half] = np.maximum(self.peaks[0:self._n:2], self.peaks[1:self._n:2])
+        self.starts[:half] = self.starts[0:self._n:2]
+        self.counts[:half] = self.counts[0:self._n:2] + self.counts[1:self._n:2]
+        self._n = half
+        self.width *= 2
+
+    def to_dict(self):
+        n = self._n
+        return {
+            'timestamps': self.starts[:n].round(3).tolist(),
+            'mean_confidence': (self.sums[:n] / self.counts[:n]).round(4).tolist(),
+            'peak_confidence': self.peaks[:n].round(4).tolist(),
+            'samples_per_point': self.width
+        }
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Frame Ring
+
+A fixed number of frame slots in one multiprocessing.shared_memory block,
+written by a single capture process/thread and read in place by detector
+workers in other processes. Nothing is pickled or copied on the way.
+
+Every slot carries a sequence number. The writer marks a slot as being
+written (negative sequence) before filling it and publishes the positive
+sequence afterwards, always overwriting the oldest slot (drop-oldest). A
+reader gets a NumPy view for a sequence and checks ``is_current`` once it
+is done with it: if the writer has lapped the reader in the meantime the
+frame is stale and any result computed from it should be discarded.
+
+Benchmark against pickling through a multiprocessing queue:
+    python frame_ring.py [--frames 1000] [--width 640] [--height 480]
+"""
+
+import argparse
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def attach_shared_memory(name):
+    """Attach to a block created by the parent process without tracking it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Child processes share the parent's resource tracker, so attaching
+        # doesn't register a second owner that could unlink the block
+        return shared_memory.SharedMemory(name=name)
+
+
+class FrameRing:
+    """Fixed-slot ring of equally shaped frames in shared memory"""
+
+    def __init__(self, slots, frame_shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+
+        # Header: [last committed sequence, sequence of each slot]
+        header_bytes = 8 * (slots + 1)
+        self._data_offset = (header_bytes + 63) // 64 * 64  # Cache-line align frames
+        size = self._data_offset + slots * self.frame_bytes
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = attach_shared_memory(name)
+
+        self.header = np.ndarray((slots + 1,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=self.dtype,
+                                 buffer=self.shm.buf, offset=self._data_offset)
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Arguments for re-opening this ring in another process"""
+        return {'name': self.name, 'slots': self.slots,
+                'frame_shape': self.frame_shape, 'dtype': self.dtype.str}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec['slots'], spec['frame_shape'], spec['dtype'], name=spec['name'])
+
+    @property
+    def last_seq(self):
+        """Sequence of the newest committed frame (0 before the first)"""
+        return int(self.header[0])
+
+    def _slot(self, seq):
+        return (seq - 1) % self.slots
+
+    # Writer side (single writer)
+
+    def begin_write(self):
+        """Claim the oldest slot; returns (seq, view) to fill in place"""
+        seq = int(self.header[0]) + 1
+        slot = self._slot(seq)
+        self.header[slot + 1] = -seq  # Readers treat the slot as invalid
+        return seq, self.frames[slot]
+
+    def commit(self, seq):
+        """Publish a slot filled after begin_write"""
+        self.header[self._slot(seq) + 1] = seq
+        self.header[0] = seq
+
+    def write(self, frame):
+        """Copy a frame into the ring (for sources that can't fill in place)"""
+        seq, view = self.begin_write()
+        view[...] = frame
+        self.commit(seq)
+        return seq
+
+    # Reader side (any number of readers)
+
+    def get(self, seq):
+        """View of frame seq, or None if it was never written or is overwritten"""
+        if seq <= 0 or not self.is_current(seq):
+            return None
+        return self.frames[self._slot(seq)]
+
+    def is_current(self, seq):
+        """True while slot seq still holds that frame (check after reading)"""
+        return int(self.header[self._slot(seq) + 1]) == seq
+
+    def latest(self):
+        """(seq, view) of the newest committed frame, or (0, None)"""
+        seq = self.last_seq
+        return seq, self.get(seq)
+
+    def close(self):
+        # Views must go before the buffer they point into
+        del self.header, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _pickle_consumer(queue, count, result):
+    start = time.process_time()
+    for _ in range(count):
+        frame = queue.get()
+        frame[0, 0, 0]  # Touch the frame like a detector would
+    result.put(time.process_time() - start)
+
+
+def _ring_consumer(spec, count, ready, result):
+    ring = FrameRing.attach(spec)
+    ready.set()
+    read_time = 0.0  # Time spent actually reading frames, not waiting for them
+    read = stale = 0
+    last = 0
+    while last < count:
+        seq = ring.last_seq
+        if seq == last:
+            time.sleep(0.0001)
+            continue
+        start = time.perf_counter()
+        frame = ring.get(seq)
+        if frame is not None:
+            frame[0, 0, 0]  # Touch the frame like a detector would
+        if frame is None or not ring.is_current(seq):
+            stale += 1
+        else:
+            read += 1
+        read_time += time.perf_counter() - start
+        last = seq
+    result.put((read_time, read, stale))
+    ring.close()
+
+
+def benchmark(frames=1000, shape=(480, 640, 3), slots=8):
+    """Compare frame transport via pickling vs. the shared-memory ring"""
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    mb = frames * frame.nbytes / 1024 / 1024
+    context = multiprocessing.get_context('spawn')
+    result = context.Queue()
+
+    # Pickled through a multiprocessing queue: every frame reaches the reader
+    queue = context.Queue(maxsize=slots)
+    consumer = context.Process(target=_pickle_consumer, args=(queue, frames, result))
+    consumer.start()
+    start, cpu = time.perf_counter(), time.process_time()
+    for _ in range(frames):
+        queue.put(frame)
+    consumer_cpu = result.get()
+    pickle_wall = time.perf_counter() - start
+    producer_cpu = time.process_time() - cpu
+    consumer.join()
+    pickle_per_frame = (producer_cpu + consumer_cpu) / frames * 1000
+
+    # Written in place into the ring, read as views; a slow reader just
+    # skips to the newest frame (drop-oldest)
+    ring = FrameRing(slots, shape)
+    ready = context.Event()
+    consumer = context.Process(target=_ring_consumer, args=(ring.spec(), frames, ready, result))
+    consumer.start()
+    ready.wait()
+    start, cpu = time.perf_counter(), time.process_time()
+    for _ in range(frames):
+        seq, view = ring.begin_write()
+        view[...] = frame  # Stands in for the capture decoding into the slot
+        ring.commit(seq)
+    ring_wall = time.perf_counter() - start
+    producer_cpu = time.process_time() - cpu
+    read_time, read, stale = result.get()
+    consumer.join()
+    ring.close()
+    ring_per_frame = producer_cpu / frames * 1000 + read_time / max(read + stale, 1) * 1000
+
+    print(f"Frames: {frames} x {shape} ({mb:.0f} MB)")
+    print(f"{'Transport':<12}{'Frames/s':>12}{'MB/s':>10}{'CPU ms/frame':>15}")
+    print(f"{'pickle':<12}{frames / pickle_wall:>12.0f}{mb / pickle_wall:>10.0f}{pickle_per_frame:>15.3f}")
+    print(f"{'ring':<12}{frames / ring_wall:>12.0f}{mb / ring_wall:>10.0f}{ring_per_frame:>15.3f}")
+    print(f"Ring reader saw {read} frames, {stale} stale, "
+          f"{frames - read - stale} dropped as the writer ran ahead")
+    print("Ring CPU includes the writer's in-place copy; the pickle path also pays "
+          "for pickling, the pipe and unpickling.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory frame ring against pickling")
+    parser.add_argument('--frames', type=int, default=1000, help="Frames to send (default: 1000)")
+    parser.add_argument('--width', type=int, default=640, help="Frame width (default: 640)")
+    parser.add_argument('--height', type=int, default=480, help="Frame height (default: 480)")
+    parser.add_argument('--slots', type=int, default=8, help="Ring slots (default: 8)")
+    args = parser.parse_args()
+
+    benchmark(args.frames, (args.height, args.width, 3), args.slots)
+
+
+if __name__ == "__main__":
+    main()
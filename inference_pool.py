@@ -0,0 +1,225 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+from violence_detector import ViolenceDetector
+from frame_ring import FrameRing, attach_shared_memory
+
+# Largest frame passed through shared memory; bigger frames are pickled
+MAX_FRAME_SHAPE = (1080, 1920, 3)
+
+# Motion histories a worker keeps, and how long an idle one is kept
+MAX_STREAMS = 64
+STREAM_TTL = 60.0  # Seconds
+
+# Per-process state of inference workers
+_detector = None
+_streams = OrderedDict()  # stream_id -> MotionState, least recently used first
+_last_used = {}  # stream_id -> monotonic time of the stream's last frame
+_attached = {}  # shared memory name -> SharedMemory
+_rings = {}  # stream_id -> FrameRing the stream's frames arrive in
+
+
+def _init_worker():
+    global _detector
+    # Ctrl+C goes to the whole process group; the server shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # One OpenCV thread per process, the pool already uses every core
+    cv2.setNumThreads(1)
+    _detector = ViolenceDetector()
+    _detector.debug = False
+
+
+def _stream_state(stream_id):
+    """Motion history of a stream; evicts idle and least recently used ones"""
+    now = time.monotonic()
+    state = _streams.pop(stream_id, None)
+    if state is None:
+        state = _detector.new_motion_state()
+    _streams[stream_id] = state
+    _last_used[stream_id] = now
+
+    while len(_streams) > 1:
+        oldest = next(iter(_streams))
+        if len(_streams) <= MAX_STREAMS and now - _last_used[oldest] <= STREAM_TTL:
+            break
+        _reset_stream(oldest)
+    return state
+
+
+def _detect(stream_id, frame):
+    """Run detection with the motion history of one stream"""
+    return _detector.detect_violence(frame, state=_stream_state(stream_id))
+
+
+def _detect_shared(stream_id, shm_name, shape, dtype):
+    """Detect on a frame read in place from a shared memory block"""
+    shm = _attached.get(shm_name)
+    if shm is None:
+        shm = _attached[shm_name] = attach_shared_memory(shm_name)
+    frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return _detect(stream_id, frame)
+
+
+def _detect_ring(stream_id, spec, seq):
+    """Detect on frame seq of a FrameRing, or return None if it went stale"""
+    ring = _rings.get(stream_id)
+    if ring is None or ring.name != spec['name']:
+        if ring is not None:
+            ring.close()
+        ring = _rings[stream_id] = FrameRing.attach(spec)
+
+    frame = ring.get(seq)
+    if frame is None:
+        return None
+
+    # The state is updated in place, so keep a snapshot to roll back to
+    state = _streams.get(stream_id)
+    if state is not None:
+        snapshot = (state.prev_gray, state.window.state())
+    result = _detect(stream_id, frame)
+    del frame
+
+    # The capture overwrote the slot while we read it; drop the result and
+    # the motion history it produced
+    if not ring.is_current(seq):
+        if state is None:
+            _reset_stream(stream_id)
+        else:
+            state.prev_gray = snapshot[0]
+            state.window.restore(snapshot[1])
+        return None
+    return result
+
+
+def _detect_pickled(stream_id, frame):
+    return _detect(stream_id, frame)
+
+
+def _reset_stream(stream_id):
+    _streams.pop(stream_id, None)
+    _last_used.pop(stream_id, None)
+
+
+def _analyze_video(video_path):
+    # Uses its own motion history, never one of the streams'
+    return _detector.detect_violence_in_video(video_path)
+
+
+class InferencePool:
+    """Worker processes that each hold their own ViolenceDetector.
+
+    Detection keeps motion history per stream, so every stream is pinned to
+    one worker. Each worker keeps at most MAX_STREAMS histories and drops
+    those idle for STREAM_TTL seconds. Camera frames are read by the worker straight out of the
+    capture's FrameRing; other frames are copied once into a shared memory
+    slot instead of being pickled. Video analysis can take minutes, so it
+    runs in separate video worker processes and frames never queue behind
+    an upload.
+    """
+
+    def __init__(self, workers=None, max_frame_shape=MAX_FRAME_SHAPE, video_workers=1):
+        self.workers = workers or os.cpu_count()
+        self.video_workers = video_workers
+        self.max_frame_bytes = int(np.prod(max_frame_shape))
+
+        # Spawn gives the same worker start-up on every platform
+        context = multiprocessing.get_context('spawn')
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker)
+            for _ in range(self.workers)
+        ]
+        self._video_executor = ProcessPoolExecutor(max_workers=video_workers, mp_context=context,
+                                                   initializer=_init_worker)
+
+        # Two slots per worker so a frame can be filled while another is read
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=self.max_frame_bytes)
+            for _ in range(self.workers * 2)
+        ]
+        self._free_slots = None
+
+    async def start(self):
+        """Wait until every worker has loaded its model"""
+        self._free_slots = asyncio.Queue()
+        for slot in self._slots:
+            self._free_slots.put_nowait(slot)
+        await asyncio.gather(
+            *[self._run(executor, _reset_stream, None) for executor in self._executors],
+            *[self._run(self._video_executor, _reset_stream, None)
+              for _ in range(self.video_workers)])
+
+    def _worker_for(self, stream_id):
+        return zlib.crc32(str(stream_id).encode()) % self.workers
+
+    def _executor_for(self, stream_id):
+        return self._executors[self._worker_for(stream_id)]
+
+    async def _run(self, executor, fn, *args, on_done=None):
+        future = executor.submit(fn, *args)
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    def _slot_releaser(self, slot):
+        """Done callback that returns slot to the free queue from any thread"""
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._free_slots.put_nowait, slot)
+            except RuntimeError:
+                pass  # Loop already closed, the pool is shutting down
+        return release
+
+    async def detect(self, frame, stream_id='default'):
+        """Detect violence in one frame of a stream"""
+        executor = self._executor_for(stream_id)
+        frame = np.ascontiguousarray(frame)
+        if frame.nbytes > self.max_frame_bytes:
+            return await self._run(executor, _detect_pickled, stream_id, frame)
+
+        slot = await self._free_slots.get()
+        try:
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=slot.buf)
+            view[...] = frame
+        except BaseException:
+            self._free_slots.put_nowait(slot)
+            raise
+
+        # The worker may still be reading the slot when this request is
+        # cancelled, so it is only freed once the job itself has finished
+        return await self._run(executor, _detect_shared, stream_id, slot.name,
+                               frame.shape, frame.dtype.str,
+                               on_done=self._slot_releaser(slot))
+
+    async def detect_in_ring(self, ring, seq, stream_id='default'):
+        """Detect violence in frame seq of a FrameRing the worker reads in place
+
+        Returns None when the frame was overwritten before or during
+        detection (the capture ran a full lap ahead).
+        """
+        return await self._run(self._executor_for(stream_id), _detect_ring,
+                               stream_id, ring.spec(), seq)
+
+    async def reset_stream(self, stream_id='default'):
+        await self._run(self._executor_for(stream_id), _reset_stream, stream_id)
+
+    async def analyze_video(self, video_path):
+        return await self._run(self._video_executor, _analyze_video, video_path)
+
+    def close(self):
+        for executor in self._executors + [self._video_executor]:
+            executor.shutdown(wait=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Prune Feature Groups by Importance and Cost
+
+Measures how much each feature group contributes to the classifier and how
+long it takes to compute, then retrains the model on the groups worth
+keeping. The saved feature schema makes the detector skip every other
+group at extraction time.
+
+Groups are removed by backward elimination: starting from all groups, each
+one is dropped in turn (least important and most expensive first), the
+model is refit, and the group stays dropped only if validation accuracy is
+within --tolerance of the all-groups model. Groups that carry overlapping
+information are therefore not all removed at once. The pruned model is only
+saved if its held-out test accuracy is also within the tolerance.
+
+Importance is the drop in held-out accuracy when all columns of a group
+are shuffled together (per-feature permutation and impurity importances are
+reported as well). Cost is the extra extraction time of the group on
+sample frames. The zero padding slots (40-49) are never computed by the
+extractor, so they are always dropped.
+
+Usage:
+    python prune_features.py [dataset_path] [--tolerance 0.005] [--dry-run]
+
+Example:
+    python prune_features.py "C:/Users/YourName/Downloads/violence_dataset"
+"""
+
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from violence_detector import ViolenceDetector, FEATURE_GROUPS, NUM_FEATURES
+
+
+def _new_forest():
+    # Same settings as train_with_dataset
+    return RandomForestClassifier(
+        n_estimators=200,
+        max_depth=15,
+        random_state=42,
+        class_weight='balanced',
+        n_jobs=-1
+    )
+
+
+def load_features(detector, dataset_path):
+    """Full feature matrix from the dataset, or synthetic data as fallback
+
+    Returns (X, y, synthetic).
+    """
+    X = y = None
+    if dataset_path:
+        X, y = detector._load_real_dataset(dataset_path)
+    if X is None or y is None:
+        print("Using synthetic training data...")
+        X, y = detector._generate_training_data()
+        return X, y, True
+    return X, y, False
+
+
+def sample_frames(dataset_path, count=20):
+    """Consecutive frame pairs to time extraction on"""
+    frames = []
+    if dataset_path:
+        for path in ViolenceDetector._get_video_files_recursive(dataset_path):
+            cap = cv2.VideoCapture(path)
+            ok, prev = cap.read()
+            ok, frame = cap.read() if ok else (False, None)
+            cap.release()
+            if ok:
+                frames.append((prev, frame))
+            if len(frames) >= count:
+                break
+
+    # Fall back to noise frames at the live camera resolution
+    rng = np.random.default_rng(0)
+    while len(frames) < count:
+        frames.append(tuple(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(2)))
+    return frames
+
+
+def measure_group_costs(detector, frames, repeats=3):
+    """Milliseconds per frame each group adds on top of the grayscale baseline"""
+    state = detector.new_motion_state()
+
+    def timed(groups):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for prev, frame in frames:
+                state.reset()
+                state.prev_gray = cv2.cvtColor(prev, cv2.COLOR_BGR2GRAY)
+                detector._extract_features(frame, groups, state=state)
+        return (time.perf_counter() - start) * 1000 / (repeats * len(frames))
+
+    baseline = timed([])
+    costs = {name: max(timed([name]) - baseline, 0.0) for name in FEATURE_GROUPS}
+    costs['_baseline'] = baseline
+    return costs
+
+
+def group_permutation_importance(model, X, y, columns, repeats=5, seed=42):
+    """Accuracy drop when every column of a group is shuffled jointly"""
+    rng = np.random.default_rng(seed)
+    baseline = model.score(X, y)
+    importances = {}
+    for name, idx in columns.items():
+        drops = []
+        for _ in range(repeats):
+            X_perm = X.copy()
+            X_perm[:, idx] = X[rng.permutation(len(X))][:, idx]
+            drops.append(baseline - model.score(X_perm, y))
+        importances[name] = float(np.mean(drops))
+    return baseline, importances
+
+
+def holdout_accuracy(X_train, y_train, X_test, y_test, cols):
+    """Accuracy on the test rows of a model fit on the given columns only"""
+    scaler = StandardScaler().fit(X_train[:, cols])
+    model = _new_forest().fit(scaler.transform(X_train[:, cols]), y_train)
+    return model.score(scaler.transform(X_test[:, cols]), y_test)
+
+
+def backward_eliminate(X, y, columns, order, tolerance):
+    """Drop groups one at a time while validation accuracy stays within tolerance"""
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y)
+
+    def accuracy(groups):
+        cols = sorted(c for name in groups for c in columns[name])
+        return holdout_accuracy(X_fit, y_fit, X_val, y_val, cols)
+
+    keep = list(order)
+    reference = accuracy(keep)
+    for name in order:
+        if len(keep) == 1:
+            break
+        candidate = [g for g in keep if g != name]
+        score = accuracy(candidate)
+        dropped = score >= reference - tolerance
+        print(f"   without {name:<16} {score:.3f} (reference {reference:.3f})"
+              f"  {'dropped' if dropped else 'kept'}")
+        if dropped:
+            keep = candidate
+    return [name for name in FEATURE_GROUPS if name in keep]
+
+
+def schema_for(groups):
+    indices = sorted(i for name in groups for i in FEATURE_GROUPS[name])
+    return {'groups': groups, 'indices': indices, 'num_features': NUM_FEATURES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune feature groups the classifier does not need")
+    parser.add_argument('dataset_path', nargs='?', default=None,
+                        help="Dataset with violence/non-violence folders (synthetic data if omitted)")
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help="Accuracy loss allowed from pruning (default: 0.005)")
+    parser.add_argument('--report', default='models/feature_report.json',
+                        help="Where to write the importance/cost report")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Only report, do not retrain or save the pruned model")
+    args = parser.parse_args()
+
+    detector = ViolenceDetector()
+    detector.debug = False
+
+    X, y, synthetic = load_features(detector, args.dataset_path)
+    if synthetic and not args.dry_run:
+        # Any single group separates the synthetic classes, which says
+        # nothing about real frames
+        print("⚠️  Synthetic data can't justify pruning, only writing the report")
+        args.dry_run = True
+    used = sorted(i for idx in FEATURE_GROUPS.values() for i in idx)
+    X = X[:, used]  # Drop the padding slots
+    columns = {name: [used.index(i) for i in idx] for name, idx in FEATURE_GROUPS.items()}
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    X_train_s, X_test_s = scaler.transform(X_train), scaler.transform(X_test)
+
+    print("Fitting reference model on all feature groups...")
+    model = _new_forest().fit(X_train_s, y_train)
+
+    full_accuracy, group_importance = group_permutation_importance(
+        model, X_test_s, y_test, columns)
+
+    feature_perm = permutation_importance(model, X_test_s, y_test, n_repeats=5,
+                                          random_state=42, n_jobs=-1)
+
+    print("Timing feature groups...")
+    costs = measure_group_costs(detector, sample_frames(args.dataset_path))
+
+    # Try to drop the least useful, most expensive groups first
+    order = sorted(FEATURE_GROUPS, key=lambda g: (group_importance[g], -costs[g]))
+    print("Backward elimination on a validation split...")
+    keep = backward_eliminate(X_train, y_train, columns, order, args.tolerance)
+    schema = schema_for(keep)
+
+    print(f"\n{'Group':<16}{'Importance':>12}{'Cost (ms)':>12}  Keep")
+    for name in sorted(FEATURE_GROUPS, key=lambda g: -group_importance[g]):
+        mark = "✓" if name in keep else "✗"
+        print(f"{name:<16}{group_importance[name]:>12.4f}{costs[name]:>12.2f}  {mark}")
+
+    full_cost = sum(costs[name] for name in FEATURE_GROUPS) + costs['_baseline']
+    pruned_cost = sum(costs[name] for name in keep) + costs['_baseline']
+
+    # Held-out accuracy of a model restricted to the kept groups
+    keep_cols = sorted(c for name in keep for c in columns[name])
+    pruned_accuracy = holdout_accuracy(X_train, y_train, X_test, y_test, keep_cols)
+    accepted = pruned_accuracy >= full_accuracy - args.tolerance
+
+    print(f"\nHeld-out accuracy: {full_accuracy:.3f} (all groups) -> {pruned_accuracy:.3f} (pruned)")
+    print(f"Extraction cost:   {full_cost:.2f} ms/frame -> {pruned_cost:.2f} ms/frame")
+
+    report = {
+        'group_importance': group_importance,
+        'group_cost_ms': costs,
+        'feature_permutation_importance': dict(zip(used, feature_perm.importances_mean.tolist())),
+        'feature_impurity_importance': dict(zip(used, model.feature_importances_.tolist())),
+        'full_accuracy': full_accuracy,
+        'pruned_accuracy': pruned_accuracy,
+        'full_cost_ms': full_cost,
+        'pruned_cost_ms': pruned_cost,
+        'tolerance': args.tolerance,
+        'accepted': accepted,
+        'schema': schema
+    }
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    if args.dry_run:
+        return
+
+    if not accepted:
+        print(f"\n❌ Pruned accuracy is more than {args.tolerance} below the full model, "
+              "model unchanged")
+        return
+
+    # Final model on all data, restricted to the kept groups
+    X_keep = X[:, keep_cols]
+    detector.scaler = StandardScaler()
+    detector.model = _new_forest().fit(detector.scaler.fit_transform(X_keep), y)
+    detector._save_model(schema)
+
+    print(f"\n✅ Pruned model saved with groups: {', '.join(keep)}")
+    print("The detector will only compute these groups from now on.")
+
+
+if __name__ == "__main__":
+    main()
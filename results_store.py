@@ -0,0 +1,207 @@
+import os
+import glob
+import numpy as np
+
+# On-disk record layout for the segment log (one row per live detection)
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('confidence', '<f4'),
+    ('is_violent', 'u1'),
+])
+
+
+class LiveResultsStore:
+    """Fixed-capacity columnar ring of live detection results.
+
+    Recent results live in preallocated NumPy arrays so appends never
+    reallocate and violent counts are kept as running counters. When a
+    ``log_dir`` is given every result is also appended to a segmented log
+    on disk, which can be queried by time range long after the ring has
+    wrapped.
+    """
+
+    def __init__(self, capacity=100, log_dir=None, segment_records=100000):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.confidences = np.zeros(capacity, dtype=np.float32)
+        self.violent = np.zeros(capacity, dtype=np.bool_)
+        self._head = 0  # Next write position
+        self._size = 0
+        self.violent_count = 0  # Violent results currently in the ring
+        self.total_count = 0  # All results ever appended
+        self.total_violent = 0
+
+        self.log = SegmentLog(log_dir, segment_records) if log_dir else None
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp, is_violent, confidence):
+        """Add one result, evicting the oldest when the ring is full"""
+        i = self._head
+        if self._size == self.capacity:
+            self.violent_count -= int(self.violent[i])
+        else:
+            self._size += 1
+
+        self.timestamps[i] = timestamp
+        self.confidences[i] = confidence
+        self.violent[i] = is_violent
+        self._head = (i + 1) % self.capacity
+
+        if is_violent:
+            self.violent_count += 1
+            self.total_violent += 1
+        self.total_count += 1
+
+        if self.log is not None:
+            self.log.append(timestamp, is_violent, confidence)
+
+    def clear(self):
+        """Reset the in-memory ring (the on-disk log is kept)"""
+        self._head = 0
+        self._size = 0
+        self.violent_count = 0
+
+    def _ordered_indices(self, n):
+        n = min(n, self._size)
+        return (self._head - n + np.arange(n)) % self.capacity
+
+    def latest(self, n=10):
+        """Return the last n results, oldest first, as JSON-ready dicts"""
+        idx = self._ordered_indices(n)
+        return [
+            {
+                'timestamp': float(self.timestamps[i]),
+                'is_violent': bool(self.violent[i]),
+                'confidence': float(self.confidences[i])
+            }
+            for i in idx
+        ]
+
+    def violent_intervals(self, start=None, end=None, max_gap=1.0):
+        """Merged violent intervals between start and end timestamps.
+
+        Uses the on-disk log when available so the query can reach past the
+        ring, otherwise falls back to whatever is still in memory.
+        """
+        if self.log is not None:
+            return self.log.violent_intervals(start, end, max_gap)
+
+        idx = self._ordered_indices(self._size)
+        ts = self.timestamps[idx]
+        lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+        hi = len(ts) if end is None else np.searchsorted(ts, end, side='right')
+        return merge_intervals(ts[lo:hi], self.confidences[idx][lo:hi],
+                               self.violent[idx][lo:hi], max_gap)
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+
+class SegmentLog:
+    """Append-only log of detection records split into fixed-size segments.
+
+    Segment files are named after their first timestamp, and the first and
+    last timestamp of every segment are kept as an in-memory time index.
+    A range query only opens the segments overlapping the range and
+    binary-searches them through a memory map.
+    """
+
+    def __init__(self, log_dir, segment_records=100000):
+        self.log_dir = log_dir
+        self.segment_records = segment_records
+        os.makedirs(log_dir, exist_ok=True)
+
+        # Time index: [path, first_ts, last_ts, records]
+        self.index = []
+        for path in sorted(glob.glob(os.path.join(log_dir, 'seg_*.bin'))):
+            records = os.path.getsize(path) // RECORD_DTYPE.itemsize
+            if records == 0:
+                continue
+            data = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(records,))
+            self.index.append([path, float(data['timestamp'][0]),
+                               float(data['timestamp'][-1]), records])
+            del data
+
+        self._file = None
+        if self.index and self.index[-1][3] < segment_records:
+            self._file = open(self.index[-1][0], 'ab')
+
+    def append(self, timestamp, is_violent, confidence):
+        if self._file is None:
+            self._start_segment(timestamp)
+
+        record = np.array([(timestamp, confidence, is_violent)], dtype=RECORD_DTYPE)
+        self._file.write(record.tobytes())
+        self._file.flush()
+
+        entry = self.index[-1]
+        entry[2] = float(timestamp)
+        entry[3] += 1
+        if entry[3] >= self.segment_records:
+            self._file.close()
+            self._file = None
+
+    def _start_segment(self, timestamp):
+        name = f"seg_{int(timestamp * 1000):016d}.bin"
+        path = os.path.join(self.log_dir, name)
+        self._file = open(path, 'ab')
+        self.index.append([path, float(timestamp), float(timestamp), 0])
+
+    def read_range(self, start=None, end=None):
+        """Return all records with start <= timestamp <= end"""
+        chunks = []
+        for path, first_ts, last_ts, records in self.index:
+            if records == 0:
+                continue
+            if start is not None and last_ts < start:
+                continue
+            if end is not None and first_ts > end:
+                break
+
+            data = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(records,))
+            ts = data['timestamp']
+            lo = 0 if start is None else np.searchsorted(ts, start, side='left')
+            hi = records if end is None else np.searchsorted(ts, end, side='right')
+            chunks.append(np.array(data[lo:hi]))
+            del data
+
+        if not chunks:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.concatenate(chunks)
+
+    def violent_intervals(self, start=None, end=None, max_gap=1.0):
+        records = self.read_range(start, end)
+        return merge_intervals(records['timestamp'], records['confidence'],
+                               records['is_violent'].astype(bool), max_gap)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def merge_intervals(timestamps, confidences, violent, max_gap=1.0):
+    """Merge violent samples closer than max_gap seconds into intervals"""
+    ts = np.asarray(timestamps)[violent]
+    conf = np.asarray(confidences)[violent]
+    if len(ts) == 0:
+        return []
+
+    # Split wherever consecutive violent samples are too far apart
+    breaks = np.flatnonzero(np.diff(ts) > max_gap) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(ts)]])
+
+    intervals = []
+    for s, e in zip(starts, ends):
+        intervals.append({
+            'start': float(ts[s]),
+            'end': float(ts[e - 1]),
+            'peak_confidence': float(conf[s:e].max()),
+            'mean_confidence': float(conf[s:e].mean()),
+            'samples': int(e - s)
+        })
+    return intervals
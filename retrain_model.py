@@ -15,6 +15,8 @@ def main():
     # Remove existing model to force retraining
     model_path = "models/violence_model.pkl"
     scaler_path = "models/scaler.pkl"
+    schema_path = "models/feature_schema.json"
+    config_path = "models/model_config.json"
     
     if os.path.exists(model_path):
         os.remove(model_path)
@@ -24,6 +26,14 @@ def main():
         os.remove(scaler_path)
         print("Removed old scaler")
     
+    if os.path.exists(schema_path):
+        os.remove(schema_path)
+        print("Removed pruned feature schema")
+    
+    if os.path.exists(config_path):
+        os.remove(config_path)
+        print("Removed tuned model config")
+    
     # Initialize detector (will train new model)
     print("Initializing detector with improved training data...")
     detector = ViolenceDetector()
@@ -405,6 +405,8 @@ function exportAsJson(filename) {
             violence_percentage: analysisResults.violence_percentage,
             is_violent_video: analysisResults.is_violent_video
         },
+        events: analysisResults.events || [],
+        confidence_curve: analysisResults.confidence_curve || null,
         frame_results: analysisResults.frame_results || []
     };
     
@@ -444,6 +446,17 @@ function exportAsPdf(filename) {
     pdfContent += `- Violence Percentage: ${Math.round(analysisResults.violence_percentage)}%\n`;
     pdfContent += `- Overall Verdict: ${analysisResults.is_violent_video ? 'Violence Detected' : 'Safe'}\n\n`;
     
+    if (analysisResults.events && analysisResults.events.length > 0) {
+        pdfContent += `Violent Events:\n`;
+        analysisResults.events.forEach(event => {
+            const start = formatTime(Math.floor(event.start));
+            const end = formatTime(Math.floor(event.end));
+            const peak = Math.round(event.peak_confidence * 100);
+            pdfContent += `${start} - ${end}: peak ${peak}%\n`;
+        });
+        pdfContent += `\n`;
+    }
+    
     if (analysisResults.frame_results && analysisResults.frame_results.length > 0) {
         pdfContent += `Frame-by-Frame Results:\n`;
         analysisResults.frame_results.forEach(frame => {
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Cross-Validated Hyperparameter Sweep for the Violence Detection Model
+
+Sweeps forest size, tree depth and the violence threshold used by
+detect_violence. Every (trees, depth, fold) forest is fit in parallel across
+cores; thresholds are scored on the same fitted forests without refitting.
+Extracted feature matrices are cached on disk so repeated sweeps over the
+same dataset skip video decoding entirely. The cache is re-extracted when
+videos are added, removed or modified, or when the extractor changes.
+
+For each configuration the sweep reports cross-validated accuracy and F1
+next to single-frame inference latency and pickled model size, and marks
+the configurations on the accuracy/latency Pareto front.
+
+Usage:
+    python sweep_model.py [dataset_path] [--trees 50,100,200] [--depths 8,10,15,none]
+                          [--thresholds 0.3,0.4,0.5] [--folds 5] [--workers N]
+                          [--save] [--max-latency-ms 5]
+
+Example:
+    python sweep_model.py "C:/Users/YourName/Downloads/violence_dataset" --save
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from violence_detector import ViolenceDetector, FEATURE_VERSION
+
+
+def _parse_list(value, cast):
+    return [None if v.strip().lower() == 'none' else cast(v) for v in value.split(',')]
+
+
+def dataset_fingerprint(detector, dataset_path):
+    """Hash of every input to feature extraction: the video files (path,
+    size, mtime), the extractor version and the temporal window settings"""
+    digest = hashlib.sha1()
+    digest.update(f"v{FEATURE_VERSION} window={detector.window_size}"
+                  f"/{detector.window_interval}\n".encode())
+    if dataset_path:
+        for path in sorted(ViolenceDetector._get_video_files_recursive(dataset_path)):
+            stat = os.stat(path)
+            relpath = os.path.relpath(path, dataset_path)
+            digest.update(f"{relpath}\t{stat.st_size}\t{stat.st_mtime_ns}\n".encode())
+    else:
+        digest.update(b"synthetic\n")
+    return digest.hexdigest()
+
+
+def load_cached_features(detector, dataset_path, cache_dir):
+    """Feature matrix for the dataset, extracted once and cached as .npz"""
+    source = os.path.abspath(dataset_path) if dataset_path else 'synthetic'
+    name = hashlib.sha1(source.encode()).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, f"features_{name}.npz")
+    fingerprint = dataset_fingerprint(detector, dataset_path)
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            if 'fingerprint' in data and str(data['fingerprint']) == fingerprint:
+                print(f"Using cached features from {cache_path}")
+                return data['X'], data['y']
+        print("Dataset or feature extractor changed since caching, re-extracting...")
+
+    X = y = None
+    if dataset_path:
+        X, y = detector._load_real_dataset(dataset_path)
+    if X is None or y is None:
+        print("Using synthetic training data...")
+        X, y = detector._generate_training_data()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(cache_path, X=X, y=y, source=source, fingerprint=fingerprint)
+    print(f"Cached features to {cache_path}")
+    return X, y
+
+
+def _fit_fold(trees, depth, fold, X_train, y_train, X_test, y_test, thresholds, keep_model):
+    """Fit one forest on one fold and score every threshold on it"""
+    model = RandomForestClassifier(
+        n_estimators=trees,
+        max_depth=depth,
+        random_state=42,
+        class_weight='balanced',
+        n_jobs=1  # Parallelism comes from running many folds at once
+    )
+    model.fit(X_train, y_train)
+    proba = model.predict_proba(X_test)[:, 1]
+
+    scores = {}
+    for threshold in thresholds:
+        predicted = proba > threshold
+        actual = y_test == 1
+        tp = np.sum(predicted & actual)
+        precision = tp / max(np.sum(predicted), 1)
+        recall = tp / max(np.sum(actual), 1)
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        scores[threshold] = (float(np.mean(predicted == actual)), float(f1))
+    return trees, depth, fold, scores, (model if keep_model else None)
+
+
+def measure_inference(model, X, repeats=200):
+    """Median single-frame predict_proba latency (ms) and pickled size (KB)"""
+    model.set_params(n_jobs=None)
+    rows = X[np.random.default_rng(0).integers(0, len(X), repeats)]
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row.reshape(1, -1))
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), len(pickle.dumps(model)) / 1024
+
+
+def pareto_front(results):
+    """Mark results no other result beats on both accuracy and latency"""
+    for r in results:
+        r['pareto'] = not any(
+            o['accuracy'] >= r['accuracy'] and o['latency_ms'] <= r['latency_ms']
+            and (o['accuracy'] > r['accuracy'] or o['latency_ms'] < r['latency_ms'])
+            for o in results
+        )
+
+
+def sweep(X, y, trees_list, depths, thresholds, folds, workers):
+    # Folds are split and scaled once, then shared by every configuration
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    cached_folds = []
+    for train_idx, test_idx in splitter.split(X, y):
+        scaler = StandardScaler().fit(X[train_idx])
+        cached_folds.append((scaler.transform(X[train_idx]), y[train_idx],
+                             scaler.transform(X[test_idx]), y[test_idx]))
+
+    jobs = [
+        delayed(_fit_fold)(trees, depth, fold, *cached_folds[fold], thresholds, fold == 0)
+        for trees in trees_list for depth in depths for fold in range(folds)
+    ]
+    print(f"Fitting {len(jobs)} forests on {workers if workers > 0 else os.cpu_count()} workers...")
+    start = time.time()
+    outputs = Parallel(n_jobs=workers)(jobs)
+    print(f"Sweep fitting took {time.time() - start:.1f}s")
+
+    # Latency and size depend only on the forest, so measure the fold-0 model
+    inference = {}
+    for trees, depth, fold, _, model in outputs:
+        if model is not None:
+            inference[(trees, depth)] = measure_inference(model, cached_folds[0][2])
+
+    results = []
+    for trees in trees_list:
+        for depth in depths:
+            fold_scores = [o[3] for o in outputs if o[0] == trees and o[1] == depth]
+            latency_ms, size_kb = inference[(trees, depth)]
+            for threshold in thresholds:
+                accuracies = [s[threshold][0] for s in fold_scores]
+                f1s = [s[threshold][1] for s in fold_scores]
+                results.append({
+                    'n_estimators': trees,
+                    'max_depth': depth,
+                    'threshold': threshold,
+                    'accuracy': float(np.mean(accuracies)),
+                    'accuracy_std': float(np.std(accuracies)),
+                    'f1': float(np.mean(f1s)),
+                    'latency_ms': latency_ms,
+                    'size_kb': size_kb
+                })
+    pareto_front(results)
+    return results
+
+
+def pick_best(results, max_latency_ms=None):
+    candidates = [r for r in results
+                  if max_latency_ms is None or r['latency_ms'] <= max_latency_ms]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda r: (r['accuracy'], -r['latency_ms']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated sweep of forest size, depth and threshold")
+    parser.add_argument('dataset_path', nargs='?', default=None,
+                        help="Dataset with violence/non-violence folders (synthetic data if omitted)")
+    parser.add_argument('--trees', default='50,100,200', help="Comma-separated tree counts")
+    parser.add_argument('--depths', default='8,10,15,none', help="Comma-separated max depths ('none' = unlimited)")
+    parser.add_argument('--thresholds', default='0.3,0.4,0.5', help="Comma-separated violence thresholds")
+    parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds (default: 5)")
+    parser.add_argument('--workers', type=int, default=-1, help="Parallel jobs (default: all cores)")
+    parser.add_argument('--cache-dir', default='models/feature_cache', help="Where extracted features are cached")
+    parser.add_argument('--report', default='models/sweep_report.json', help="Where to write the sweep results")
+    parser.add_argument('--save', action='store_true',
+                        help="Retrain the best configuration on all data and make it the active model")
+    parser.add_argument('--max-latency-ms', type=float, default=None,
+                        help="Only consider configurations at or under this per-frame latency when saving")
+    args = parser.parse_args()
+
+    detector = ViolenceDetector()
+    detector.debug = False
+
+    X, y = load_cached_features(detector, args.dataset_path, args.cache_dir)
+    if detector.feature_indices is not None:
+        X = X[:, detector.feature_indices]  # Match the active pruned schema
+
+    results = sweep(X, y,
+                    _parse_list(args.trees, int),
+                    _parse_list(args.depths, int),
+                    _parse_list(args.thresholds, float),
+                    args.folds, args.workers)
+
+    print(f"\n{'Trees':>6}{'Depth':>7}{'Thresh':>8}{'Accuracy':>14}{'F1':>7}"
+          f"{'Latency (ms)':>14}{'Size (KB)':>11}  Pareto")
+    for r in sorted(results, key=lambda r: -r['accuracy']):
+        depth = r['max_depth'] if r['max_depth'] is not None else 'none'
+        mark = "★" if r['pareto'] else ""
+        print(f"{r['n_estimators']:>6}{depth:>7}{r['threshold']:>8.2f}"
+              f"{r['accuracy']:>8.3f} ±{r['accuracy_std']:.3f}{r['f1']:>7.3f}"
+              f"{r['latency_ms']:>14.2f}{r['size_kb']:>11.0f}  {mark}")
+
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nReport written to {args.report}")
+
+    if not args.save:
+        return
+
+    best = pick_best(results, args.max_latency_ms)
+    if best is None:
+        print("❌ No configuration meets the latency limit, model unchanged")
+        return
+
+    detector.scaler = StandardScaler()
+    detector.model = RandomForestClassifier(
+        n_estimators=best['n_estimators'],
+        max_depth=best['max_depth'],
+        random_state=42,
+        class_weight='balanced',
+        n_jobs=-1
+    )
+    detector.model.fit(detector.scaler.fit_transform(X), y)
+    detector.threshold = best['threshold']
+    detector._save_model(detector.feature_schema)
+
+    print(f"\n✅ Saved model with {best['n_estimators']} trees, depth {best['max_depth']}, "
+          f"threshold {best['threshold']}")
+    print(f"   CV accuracy {best['accuracy']:.3f}, {best['latency_ms']:.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from collections import deque
+
+import numpy as np
+
+
+class MotionState:
+    """Motion history of one source of frames.
+
+    The grayscale of the previously analysed frame (for frame differencing)
+    and the TemporalWindow. Every video or stream needs its own, so an
+    uploaded video never mixes its motion with the live camera's.
+    """
+
+    def __init__(self, window_size=10, window_interval=1.0):
+        self.prev_gray = None
+        self.window = TemporalWindow(window_size, window_interval)
+
+    def reset(self):
+        self.prev_gray = None
+        self.window.reset()
+
+
+class TemporalWindow:
+    """Rolling statistics of motion over the last ``size`` samples.
+
+    Samples are taken at most once every ``interval`` seconds of video or
+    wall-clock time, so the window spans the same time (and acceleration is
+    differenced over the same step) whether the caller analyses every frame
+    of a live stream, every 10th frame of an upload, or every 30th frame
+    while training. Frames in between return the current window features.
+
+    Every update is O(1): the mean and variance come from running sums over
+    a small ring of motion magnitudes, and the sliding maximum of contour
+    counts is kept with a monotonic deque. No frames are stored.
+    """
+
+    NUM_FEATURES = 4
+
+    def __init__(self, size=10, interval=1.0):
+        self.size = size
+        self.interval = interval
+        self.magnitudes = np.zeros(size)
+        self.reset()
+
+    def reset(self):
+        self.magnitudes[:] = 0
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._prev_magnitude = None
+        self._prev_velocity = 0.0
+        self._max_contours = deque()  # (frame index, count), counts decreasing
+        self._frame_index = 0
+        self._next_sample = None  # Earliest timestamp of the next sample
+        self._features = [0.0, 0.0, 0.0, 0]
+
+    def state(self):
+        """Snapshot of the window, to undo later updates with restore()"""
+        return (self.magnitudes.copy(), self._head, self._count, self._sum, self._sum_sq,
+                self._prev_magnitude, self._prev_velocity, tuple(self._max_contours),
+                self._frame_index, self._next_sample, tuple(self._features))
+
+    def restore(self, state):
+        (magnitudes, self._head, self._count, self._sum, self._sum_sq,
+         self._prev_magnitude, self._prev_velocity, max_contours,
+         self._frame_index, self._next_sample, features) = state
+        self.magnitudes[:] = magnitudes
+        self._max_contours = deque(max_contours)
+        self._features = list(features)
+
+    def update(self, motion_magnitude, motion_contours, timestamp):
+        """Add one frame's motion and return the window features.
+
+        ``timestamp`` is in seconds (video position or a monotonic clock).
+        Returns [mean motion, motion variance, motion acceleration,
+        max motion contours] over the current window.
+        """
+        # Small slack so frame_count / fps rounding doesn't skip a sample
+        if self._next_sample is not None and timestamp < self._next_sample - 1e-6:
+            return list(self._features)
+        self._next_sample = timestamp + self.interval
+
+        # Running mean / variance over the ring of magnitudes
+        if self._count == self.size:
+            old = self.magnitudes[self._head]
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self._count += 1
+        self.magnitudes[self._head] = motion_magnitude
+        self._sum += motion_magnitude
+        self._sum_sq += motion_magnitude * motion_magnitude
+        self._head = (self._head + 1) % self.size
+        if self._head == 0:
+            # Re-sum once per lap so rounding error can't accumulate
+            self._sum = self.magnitudes.sum()
+            self._sum_sq = np.dot(self.magnitudes, self.magnitudes)
+
+        mean = self._sum / self._count
+        variance = max(self._sum_sq / self._count - mean * mean, 0.0)
+
+        # Acceleration is the change in sample-to-sample motion
+        if self._prev_magnitude is None:
+            velocity = 0.0
+        else:
+            velocity = motion_magnitude - self._prev_magnitude
+        acceleration = abs(velocity - self._prev_velocity)
+        self._prev_magnitude = motion_magnitude
+        self._prev_velocity = velocity
+
+        # Sliding max of contour counts (monotonic deque)
+        index = self._frame_index
+        self._frame_index += 1
+        while self._max_contours and self._max_contours[-1][1] <= motion_contours:
+            self._max_contours.pop()
+        self._max_contours.append((index, motion_contours))
+        if self._max_contours[0][0] <= index - self.size:
+            self._max_contours.popleft()
+        max_contours = self._max_contours[0][1]
+
+        self._features = [mean, variance, acceleration, max_contours]
+        return list(self._features)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Incrementally Update the Violence Detection Model
+
+Adds newly labelled videos to the current model without a full retrain.
+Features of the new videos are saved as a shard under models/shards/, and
+extra trees are grown on them (plus a replay sample of earlier shards)
+while the existing trees are kept. Every update is saved as a new version
+under models/versions/ and becomes the active model.
+
+Expected dataset structure (same as train_real_model.py):
+new_clips/
+├── violence/     (or violent, fight, Violence, etc.)
+└── non-violence/ (or non-violent, normal, NonViolence, etc.)
+
+Usage:
+    python train_incremental.py <dataset_path> [--trees 50] [--replay 2000] [--compare-full]
+
+Example:
+    python train_incremental.py "C:/Users/YourName/Downloads/week_42_clips" --compare-full
+"""
+
+import argparse
+import os
+from violence_detector import ViolenceDetector
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally update the violence detection model")
+    parser.add_argument('dataset_path', help="Folder with newly labelled violence/non-violence videos")
+    parser.add_argument('--trees', type=int, default=50,
+                        help="Number of trees to add (default: 50)")
+    parser.add_argument('--replay', type=int, default=2000,
+                        help="Samples replayed from earlier shards (default: 2000)")
+    parser.add_argument('--compare-full', action='store_true',
+                        help="Also time a full retrain on all shards for comparison")
+    args = parser.parse_args()
+
+    # Check if dataset path exists
+    if not os.path.exists(args.dataset_path):
+        print(f"Error: Dataset path '{args.dataset_path}' does not exist!")
+        return
+
+    detector = ViolenceDetector()
+    result = detector.train_incremental(args.dataset_path, extra_trees=args.trees,
+                                        replay_samples=args.replay,
+                                        compare_full=args.compare_full)
+
+    if result:
+        print("\n✅ Incremental update completed successfully!")
+        if args.compare_full and result['incremental_seconds'] > 0:
+            speedup = result['full_retrain_seconds'] / result['incremental_seconds']
+            print(f"Incremental update was {speedup:.1f}x faster than a full retrain.")
+        print("Restart the Flask app to use the updated model: python app.py")
+    else:
+        print("\n❌ Incremental update failed!")
+        print("Please check your dataset structure and try again.")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,58 @@
 import cv2
 import numpy as np
 import os
+import json
+import time
+import glob
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.preprocessing import StandardScaler
 import joblib
+from collections import deque
+from event_builder import EventBuilder, ConfidenceCurve
+from temporal_features import MotionState
 import warnings
 warnings.filterwarnings('ignore')
 
+NUM_FEATURES = 50
+
+# Bump whenever _extract_features or the synthetic data changes, so cached
+# feature matrices (see sweep_model.py) are re-extracted
+FEATURE_VERSION = 3
+
+# Slots of each feature group in the NUM_FEATURES-long feature vector
+FEATURE_GROUPS = {
+    'motion': [0, 1, 2],
+    'edges': [3],
+    'red': [4],
+    'intensity': [5, 6],
+    'gradient': [7, 8],
+    'texture': [9, 10],
+    'contours': [11, 12, 13],
+    'frame_diff': [14, 15, 16],
+    'histogram': list(range(17, 33)),
+    'color_variance': [33, 34, 35],
+    'temporal': [36, 37, 38, 39],
+}
+
 class ViolenceDetector:
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
-        self.frame_buffer = []
-        self.buffer_size = 10
+        self.window_size = 10
+        self.window_interval = 1.0  # Seconds between temporal window samples
+        self.motion = self.new_motion_state()  # Motion history of live frames
         self.model_path = 'models/violence_model.pkl'
         self.scaler_path = 'models/scaler.pkl'
+        self.schema_path = 'models/feature_schema.json'
+        self.config_path = 'models/model_config.json'
+        self.threshold = 0.3  # Violence probability above which a frame is violent
+        self.shard_dir = 'models/shards'  # Labelled feature shards for incremental training
+        self.versions_dir = 'models/versions'
+        self.feature_schema = None
+        self.active_groups = None  # Feature groups the model needs (None = all)
+        self.feature_indices = None  # Columns of the full vector the model uses
+        self.debug = True  # Print per-frame confidence while detecting
         
         # Initialize or load model
         self._initialize_model()
@@ -26,28 +63,86 @@ class ViolenceDetector:
             # Load existing model
             self.model = joblib.load(self.model_path)
             self.scaler = joblib.load(self.scaler_path)
+            if os.path.exists(self.schema_path):
+                with open(self.schema_path) as f:
+                    self._set_schema(json.load(f))
+                print(f"Using pruned feature groups: {', '.join(self.active_groups)}")
+            if os.path.exists(self.config_path):
+                with open(self.config_path) as f:
+                    self.threshold = json.load(f).get('threshold', self.threshold)
             print("Loaded existing violence detection model")
         else:
             # Train a new model with synthetic data
             self._train_model()
     
-    def _extract_features(self, frame):
-        """Extract features from a video frame"""
+    def _set_schema(self, schema):
+        """Restrict extraction to the feature groups listed in schema"""
+        self.feature_schema = schema
+        if schema is None:
+            self.active_groups = None
+            self.feature_indices = None
+        else:
+            self.active_groups = list(schema['groups'])
+            self.feature_indices = np.array(schema['indices'])
+    
+    def _save_model(self, schema=None):
+        """Save model and scaler, with the feature schema for pruned models"""
+        # Forests are fit on all cores, but single-frame predictions are
+        # faster without joblib dispatch
+        if isinstance(self.model, RandomForestClassifier):
+            self.model.set_params(n_jobs=None)
+        
+        os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+        joblib.dump(self.model, self.model_path)
+        joblib.dump(self.scaler, self.scaler_path)
+        with open(self.config_path, 'w') as f:
+            json.dump({'threshold': self.threshold}, f, indent=2)
+        
+        # A model trained on the full vector must not pick up a stale schema
+        if schema is not None:
+            with open(self.schema_path, 'w') as f:
+                json.dump(schema, f, indent=2)
+        elif os.path.exists(self.schema_path):
+            os.remove(self.schema_path)
+        self._set_schema(schema)
+    
+    def new_motion_state(self):
+        """Empty motion history for a new video or stream"""
+        return MotionState(self.window_size, self.window_interval)
+    
+    def _extract_features(self, frame, groups=None, timestamp=None, state=None):
+        """Extract features from a video frame
+
+        Only the feature groups named in ``groups`` are computed (all of
+        them when None); the slots of skipped groups are left at zero so the
+        vector layout is always the same NUM_FEATURES elements. ``timestamp``
+        (seconds) spaces the temporal window samples; live frames default to
+        the monotonic clock. ``state`` is the MotionState of the frame's
+        source, the live one (self.motion) when None.
+        """
         try:
+            features = np.zeros(NUM_FEATURES)
             if frame is None:
-                return np.zeros(50)  # Return zero features if frame is None
-                
-            features = []
+                return features  # Return zero features if frame is None
+            
+            if groups is None:
+                groups = FEATURE_GROUPS
+            if state is None:
+                state = self.motion
             
             # Convert to grayscale
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
+            # Frame difference is shared by the motion, frame_diff and temporal groups
+            frame_diff = None
+            needs_motion = 'motion' in groups or 'temporal' in groups
+            if ((needs_motion or 'frame_diff' in groups) and state.prev_gray is not None
+                    and state.prev_gray.shape == gray.shape):
+                frame_diff = cv2.absdiff(state.prev_gray, gray)
+            
             # 1. Motion features (using frame difference instead of optical flow)
-            if len(self.frame_buffer) > 0:
-                prev_gray = cv2.cvtColor(self.frame_buffer[-1], cv2.COLOR_BGR2GRAY)
-                
-                # Use frame difference for motion detection (more reliable)
-                frame_diff = cv2.absdiff(prev_gray, gray)
+            motion_magnitude = motion_std = motion_contours = 0
+            if needs_motion and frame_diff is not None:
                 motion_magnitude = np.mean(frame_diff)
                 motion_std = np.std(frame_diff)
                 
@@ -55,97 +150,92 @@ class ViolenceDetector:
                 _, thresh = cv2.threshold(frame_diff, 25, 255, cv2.THRESH_BINARY)
                 contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
                 motion_contours = len(contours)
-            else:
-                motion_magnitude = 0
-                motion_std = 0
-                motion_contours = 0
-            
-            features.extend([motion_magnitude, motion_std, motion_contours])
-        
-            # 2. Edge features
-            edges = cv2.Canny(gray, 50, 150)
-            edge_density = np.sum(edges) / (edges.shape[0] * edges.shape[1])
-            features.append(edge_density)
             
-            # 3. Color features
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            if 'motion' in groups:
+                features[0:3] = [motion_magnitude, motion_std, motion_contours]
             
-            # Red color detection (often associated with violence/blood)
-            lower_red1 = np.array([0, 50, 50])
-            upper_red1 = np.array([10, 255, 255])
-            lower_red2 = np.array([170, 50, 50])
-            upper_red2 = np.array([180, 255, 255])
+            # 2. Edge features (edges are also needed for contours)
+            if 'edges' in groups or 'contours' in groups:
+                edges = cv2.Canny(gray, 50, 150)
+            if 'edges' in groups:
+                edge_density = np.sum(edges) / (edges.shape[0] * edges.shape[1])
+                features[3] = edge_density
             
-            mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
-            mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
-            red_mask = mask1 + mask2
-            red_ratio = np.sum(red_mask) / (frame.shape[0] * frame.shape[1])
-            features.append(red_ratio)
+            # 3. Color features
+            if 'red' in groups:
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+                
+                # Red color detection (often associated with violence/blood)
+                lower_red1 = np.array([0, 50, 50])
+                upper_red1 = np.array([10, 255, 255])
+                lower_red2 = np.array([170, 50, 50])
+                upper_red2 = np.array([180, 255, 255])
+                
+                mask1 = cv2.inRange(hsv, lower_red1, upper_red1)
+                mask2 = cv2.inRange(hsv, lower_red2, upper_red2)
+                red_mask = mask1 + mask2
+                red_ratio = np.sum(red_mask) / (frame.shape[0] * frame.shape[1])
+                features[4] = red_ratio
             
             # 4. Intensity features
-            intensity_mean = np.mean(gray)
-            intensity_std = np.std(gray)
-            features.extend([intensity_mean, intensity_std])
+            if 'intensity' in groups:
+                features[5:7] = [np.mean(gray), np.std(gray)]
             
             # 5. Gradient features
-            grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
-            grad_mean = np.mean(gradient_magnitude)
-            grad_std = np.std(gradient_magnitude)
-            features.extend([grad_mean, grad_std])
+            if 'gradient' in groups:
+                grad_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+                grad_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+                gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
+                features[7:9] = [np.mean(gradient_magnitude), np.std(gradient_magnitude)]
             
             # 6. Texture features (using Local Binary Pattern approximation)
-            kernel = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]])
-            texture = cv2.filter2D(gray, -1, kernel)
-            texture_mean = np.mean(texture)
-            texture_std = np.std(texture)
-            features.extend([texture_mean, texture_std])
+            if 'texture' in groups:
+                kernel = np.array([[-1, -1, -1], [-1, 8, -1], [-1, -1, -1]])
+                texture = cv2.filter2D(gray, -1, kernel)
+                features[9:11] = [np.mean(texture), np.std(texture)]
             
             # 7. Contour features
-            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            num_contours = len(contours)
-            if contours:
-                areas = [cv2.contourArea(c) for c in contours]
-                max_area = max(areas) if areas else 0
-                mean_area = np.mean(areas) if areas else 0
-            else:
-                max_area = 0
-                mean_area = 0
-            
-            features.extend([num_contours, max_area, mean_area])
+            if 'contours' in groups:
+                contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                num_contours = len(contours)
+                if contours:
+                    areas = [cv2.contourArea(c) for c in contours]
+                    max_area = max(areas) if areas else 0
+                    mean_area = np.mean(areas) if areas else 0
+                else:
+                    max_area = 0
+                    mean_area = 0
+                
+                features[11:14] = [num_contours, max_area, mean_area]
             
             # 8. Additional motion features
-            if len(self.frame_buffer) > 0:
-                # Frame difference
-                diff = cv2.absdiff(gray, cv2.cvtColor(self.frame_buffer[-1], cv2.COLOR_BGR2GRAY))
-                diff_mean = np.mean(diff)
-                diff_std = np.std(diff)
-                diff_max = np.max(diff)
-            else:
-                diff_mean = diff_std = diff_max = 0
-            
-            features.extend([diff_mean, diff_std, diff_max])
+            if 'frame_diff' in groups and frame_diff is not None:
+                features[14:17] = [np.mean(frame_diff), np.std(frame_diff), np.max(frame_diff)]
             
             # 9. Histogram features
-            hist = cv2.calcHist([gray], [0], None, [16], [0, 256])
-            hist_features = hist.flatten() / np.sum(hist)  # Normalize
-            features.extend(hist_features[:16])  # Use first 16 bins
+            if 'histogram' in groups:
+                hist = cv2.calcHist([gray], [0], None, [16], [0, 256])
+                features[17:33] = hist.flatten() / np.sum(hist)  # Normalize
             
             # 10. Additional color variance features
-            b, g, r = cv2.split(frame)
-            color_vars = [np.var(b), np.var(g), np.var(r)]
-            features.extend(color_vars)
+            if 'color_variance' in groups:
+                b, g, r = cv2.split(frame)
+                features[33:36] = [np.var(b), np.var(g), np.var(r)]
             
-            # Ensure we have exactly 50 features
-            while len(features) < 50:
-                features.append(0)
+            # 11. Temporal features over the last window_size samples
+            if 'temporal' in groups:
+                if timestamp is None:
+                    timestamp = time.monotonic()
+                features[36:40] = state.window.update(
+                    motion_magnitude, motion_contours, timestamp)
             
-            return np.array(features[:50])
+            # Remaining slots (40-49) are unused padding
+            state.prev_gray = gray
+            return features
             
         except Exception as e:
             print(f"Error extracting features: {e}")
-            return np.zeros(50)  # Return zero features if extraction fails
+            return np.zeros(NUM_FEATURES)  # Return zero features if extraction fails
     
     def _generate_training_data(self):
         """Generate improved synthetic training data for violence detection"""
@@ -199,9 +289,13 @@ class ViolenceDetector:
             features[34] = np.random.normal(900, 250)
             features[35] = np.random.normal(700, 180)
             
-            # Fill remaining features with correlated noise
-            for i in range(36, 50):
-                features[i] = np.random.normal(10, 3)
+            # Temporal features (36-39): Sustained, jerky motion
+            features[36] = np.random.normal(14, 5)   # Windowed motion mean
+            features[37] = np.random.normal(40, 15)  # Windowed motion variance
+            features[38] = np.random.normal(6, 3)    # Motion acceleration
+            features[39] = np.random.normal(8, 3)    # Max motion contours
+            
+            # Slots 40-49 stay zero, as the extractor leaves them
             
             # Ensure no negative values
             features = np.abs(features)
@@ -254,9 +348,13 @@ class ViolenceDetector:
             features[34] = np.random.normal(350, 120)
             features[35] = np.random.normal(280, 90)
             
-            # Fill remaining features
-            for i in range(36, 50):
-                features[i] = np.random.normal(3, 1)
+            # Temporal features: Steady, low motion
+            features[36] = np.random.normal(2, 1)
+            features[37] = np.random.normal(1, 0.5)
+            features[38] = np.random.normal(0.8, 0.4)
+            features[39] = np.random.normal(1.5, 0.7)
+            
+            # Slots 40-49 stay zero, as the extractor leaves them
             
             # Ensure no negative values
             features = np.abs(features)
@@ -335,7 +433,8 @@ class ViolenceDetector:
         print(f"Loaded {len(violent_features)} violent samples and {len(non_violent_features)} non-violent samples")
         return X, y
     
-    def _get_video_files_recursive(self, directory):
+    @staticmethod
+    def _get_video_files_recursive(directory):
         """Recursively find all video files in directory and subdirectories"""
         video_files = []
         video_extensions = ('.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv')
@@ -358,32 +457,35 @@ class ViolenceDetector:
             
             # Get video info
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
             print(f"  📹 Video info: {total_frames} frames, {fps:.1f} FPS")
             
             features_list = []
             frame_count = 0
             processed_frames = 0
             
-            # Extract features from multiple frames (every 30th frame)
+            # Extract features from multiple frames (one per temporal window
+            # step, every 30th frame at 30 FPS)
+            stride = max(int(round(fps * self.window_interval)), 1)
+            state = self.new_motion_state()  # Motion history of this video only
             while True:
                 ret, frame = cap.read()
                 if not ret:
                     break
                 
-                if frame_count % 30 == 0:  # Sample every 30th frame
+                if frame_count % stride == 0:
                     if frame is not None:
-                        # Clear frame buffer for each new video
-                        if frame_count == 0:
-                            self.frame_buffer = []
-                            
-                        features = self._extract_features(frame)
-                        if features is not None and len(features) == 50:
+                        features = self._extract_features(frame, timestamp=frame_count / fps,
+                                                          state=state)
+                        if features is not None and len(features) == NUM_FEATURES:
                             features_list.append(features)
                             processed_frames += 1
                             print(f"    ✓ Extracted features from frame {frame_count}")
                         else:
                             print(f"    ❌ Failed to extract features from frame {frame_count}")
+                elif frame_count % stride == stride - 1:
+                    # Keep the preceding frame so motion is a one-frame difference
+                    state.prev_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                 
                 frame_count += 1
                 
@@ -411,12 +513,18 @@ class ViolenceDetector:
         print("Training with real dataset...")
         
         # Try to load real dataset
+        start = time.time()
         X, y = self._load_real_dataset(dataset_path)
+        source = dataset_path
         
         # Fallback to synthetic data if real dataset fails
         if X is None or y is None:
             print("Falling back to synthetic training data...")
             X, y = self._generate_training_data()
+            source = 'synthetic'
+        
+        # Keep the training set so incremental updates can replay it
+        self._save_shard(X, y, source, time.time() - start, base=True)
         
         # Scale features
         X_scaled = self.scaler.fit_transform(X)
@@ -426,15 +534,14 @@ class ViolenceDetector:
             n_estimators=200,  # More trees for real data
             max_depth=15,      # Deeper trees for complex patterns
             random_state=42,
-            class_weight='balanced'
+            class_weight='balanced',
+            n_jobs=-1
         )
         
         self.model.fit(X_scaled, y)
         
         # Save model and scaler
-        os.makedirs('models', exist_ok=True)
-        joblib.dump(self.model, self.model_path)
-        joblib.dump(self.scaler, self.scaler_path)
+        self._save_model()
         
         print("Model trained and saved successfully!")
         print(f"Training accuracy: {self.model.score(X_scaled, y):.3f}")
@@ -446,6 +553,7 @@ class ViolenceDetector:
         
         # Generate training data
         X, y = self._generate_training_data()
+        self._save_shard(X, y, 'synthetic', 0.0, base=True)
         
         # Scale features
         X_scaled = self.scaler.fit_transform(X)
@@ -455,33 +563,218 @@ class ViolenceDetector:
             n_estimators=100,
             max_depth=10,
             random_state=42,
-            class_weight='balanced'
+            class_weight='balanced',
+            n_jobs=-1
         )
         
         self.model.fit(X_scaled, y)
         
         # Save model and scaler
-        os.makedirs('models', exist_ok=True)
-        joblib.dump(self.model, self.model_path)
-        joblib.dump(self.scaler, self.scaler_path)
+        self._save_model()
         
         print("Model trained and saved successfully!")
         print(f"Training accuracy: {self.model.score(X_scaled, y):.3f}")
     
-    def detect_violence(self, frame):
-        """Detect violence in a single frame"""
+    def _save_shard(self, X, y, source, extraction_seconds, base=False):
+        """Store a labelled feature matrix for later incremental training
+        
+        The base shard holds the training set of the last full training and
+        is replaced by the next one; incremental shards are kept.
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        if base:
+            path = self._base_shard_path()
+        else:
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(self.shard_dir, f"shard_{stamp}.npz")
+            suffix = 1
+            while os.path.exists(path):
+                path = os.path.join(self.shard_dir, f"shard_{stamp}_{suffix}.npz")
+                suffix += 1
+        
+        np.savez_compressed(path, X=X, y=y, source=source,
+                            extraction_seconds=extraction_seconds)
+        return path
+    
+    def _base_shard_path(self):
+        return os.path.join(self.shard_dir, 'shard_000_base.npz')  # Sorts first
+    
+    def _load_shards(self, exclude=()):
+        """Load all saved feature shards as (path, X, y, extraction_seconds)"""
+        shards = []
+        for path in sorted(glob.glob(os.path.join(self.shard_dir, 'shard_*.npz'))):
+            if path in exclude:
+                continue
+            with np.load(path) as data:
+                shards.append((path, data['X'], data['y'], float(data['extraction_seconds'])))
+        return shards
+    
+    def _save_version(self, metadata):
+        """Snapshot the current model, scaler, schema and config as a new version
+        
+        The files match what _save_model writes to models/, so a version can
+        be restored by copying them back.
+        """
+        if isinstance(self.model, RandomForestClassifier):
+            self.model.set_params(n_jobs=None)  # Same as _save_model
+        
+        os.makedirs(self.versions_dir, exist_ok=True)
+        number = len(glob.glob(os.path.join(self.versions_dir, 'v*'))) + 1
+        version = f"v{number:03d}_{time.strftime('%Y%m%d_%H%M%S')}"
+        version_dir = os.path.join(self.versions_dir, version)
+        os.makedirs(version_dir)
+        
+        joblib.dump(self.model, os.path.join(version_dir, 'violence_model.pkl'))
+        joblib.dump(self.scaler, os.path.join(version_dir, 'scaler.pkl'))
+        with open(os.path.join(version_dir, 'model_config.json'), 'w') as f:
+            json.dump({'threshold': self.threshold}, f, indent=2)
+        if self.feature_schema is not None:
+            with open(os.path.join(version_dir, 'feature_schema.json'), 'w') as f:
+                json.dump(self.feature_schema, f, indent=2)
+        with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        return version
+    
+    def train_incremental(self, dataset_path, extra_trees=50, replay_samples=2000,
+                          compare_full=False):
+        """Add trees trained on newly labelled videos to the current forest
+        
+        The new videos are stored as a feature shard, and the extra trees are
+        fit on them plus a random replay sample of earlier shards. The scaler
+        is kept as-is so existing trees see the same inputs. Each update is
+        saved as a new version under versions_dir.
+        """
+        print("Incremental training with new dataset...")
+        
+        if not isinstance(self.model, RandomForestClassifier):
+            print("Incremental training needs a RandomForest model")
+            return None
+        
+        # Snapshot the model we start from so it can be restored later
+        if not glob.glob(os.path.join(self.versions_dir, 'v*')):
+            base = self._save_version({'type': 'base', 'n_estimators': self.model.n_estimators})
+            print(f"Saved current model as {base}")
+        
+        start = time.time()
+        X_new, y_new = self._load_real_dataset(dataset_path)
+        if X_new is None or y_new is None:
+            print("No new features extracted, model unchanged")
+            return None
+        extraction_seconds = time.time() - start
+        shard_path = self._save_shard(X_new, y_new, dataset_path, extraction_seconds)
+        print(f"Saved {len(y_new)} new samples to {shard_path}")
+        
+        # Replay part of the earlier shards so new trees see both old and new data
+        old_shards = self._load_shards(exclude=[shard_path])
+        has_base = any(shard[0] == self._base_shard_path() for shard in old_shards)
+        if not has_base:
+            print("⚠️  The base training set was not saved (model trained before shards "
+                  "existed); replay and --compare-full only cover incremental shards")
+        X_fit, y_fit = X_new, y_new
+        if old_shards and replay_samples > 0:
+            X_old = np.vstack([shard[1] for shard in old_shards])
+            y_old = np.hstack([shard[2] for shard in old_shards])
+            rng = np.random.default_rng()
+            idx = rng.choice(len(y_old), size=min(replay_samples, len(y_old)), replace=False)
+            X_fit = np.vstack([X_new, X_old[idx]])
+            y_fit = np.hstack([y_new, y_old[idx]])
+        
+        if len(np.unique(y_fit)) < 2:
+            print("Incremental data must contain both violent and non-violent samples")
+            return None
+        
+        if self.feature_indices is not None:
+            X_fit = X_fit[:, self.feature_indices]
+        X_scaled = self.scaler.transform(X_fit)
+        
+        # Warm start keeps the existing trees and only grows extra_trees new ones
+        previous_trees = self.model.n_estimators
+        fit_start = time.time()
+        self.model.set_params(warm_start=True, n_estimators=previous_trees + extra_trees,
+                              n_jobs=-1)
+        self.model.fit(X_scaled, y_fit)
+        self.model.set_params(warm_start=False)
+        fit_seconds = time.time() - fit_start
+        
+        metadata = {
+            'type': 'incremental',
+            'dataset_path': dataset_path,
+            'shard': shard_path,
+            'new_samples': int(len(y_new)),
+            'replayed_samples': int(len(y_fit) - len(y_new)),
+            'n_estimators': self.model.n_estimators,
+            'previous_n_estimators': previous_trees,
+            'extraction_seconds': extraction_seconds,
+            'fit_seconds': fit_seconds,
+            'incremental_seconds': extraction_seconds + fit_seconds,
+            'base_shard_replayed': has_base
+        }
+        
+        if compare_full:
+            metadata.update(self._time_full_retrain(old_shards, X_new, y_new,
+                                                    extraction_seconds))
+        
+        self._save_model(self.feature_schema)
+        version = self._save_version(metadata)
+        
+        print(f"Model updated: {previous_trees} -> {self.model.n_estimators} trees ({version})")
+        print(f"Accuracy on new samples: {self.model.score(X_scaled[:len(y_new)], y_new):.3f}")
+        print(f"Incremental update took {metadata['incremental_seconds']:.1f}s "
+              f"({extraction_seconds:.1f}s extraction, {fit_seconds:.1f}s fitting)")
+        if compare_full:
+            print(f"Full retrain would take {metadata['full_retrain_seconds']:.1f}s "
+                  f"({metadata['full_extraction_seconds']:.1f}s extraction, "
+                  f"{metadata['full_fit_seconds']:.1f}s fitting)")
+        return metadata
+    
+    def _time_full_retrain(self, old_shards, X_new, y_new, extraction_seconds):
+        """Time a from-scratch refit on every shard, for comparison only"""
+        X_all = np.vstack([shard[1] for shard in old_shards] + [X_new])
+        y_all = np.hstack([shard[2] for shard in old_shards] + [y_new])
+        if self.feature_indices is not None:
+            X_all = X_all[:, self.feature_indices]
+        
+        start = time.time()
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X_all)
+        full_model = RandomForestClassifier(
+            n_estimators=self.model.n_estimators,
+            max_depth=self.model.max_depth,
+            random_state=42,
+            class_weight='balanced',
+            n_jobs=-1
+        )
+        full_model.fit(X_scaled, y_all)
+        full_fit_seconds = time.time() - start
+        
+        # Re-extracting every video is the dominant cost of a full retrain
+        full_extraction = extraction_seconds + sum(shard[3] for shard in old_shards)
+        return {
+            'full_fit_seconds': full_fit_seconds,
+            'full_extraction_seconds': full_extraction,
+            'full_retrain_seconds': full_extraction + full_fit_seconds
+        }
+    
+    def reset_temporal_state(self):
+        """Forget the live motion history, e.g. when live detection restarts"""
+        self.motion.reset()
+    
+    def detect_violence(self, frame, timestamp=None, state=None):
+        """Detect violence in a single frame
+
+        ``timestamp`` is the frame's position in seconds for recorded video;
+        live frames use the monotonic clock. ``state`` is the MotionState of
+        the frame's source (the live one when None).
+        """
         if frame is None:
             return False, 0.0
         
-        # Add frame to buffer
-        self.frame_buffer.append(frame.copy())
-        if len(self.frame_buffer) > self.buffer_size:
-            self.frame_buffer.pop(0)
-        
-        # Extract features
-        features = self._extract_features(frame)
+        # Extract features (also advances the motion history)
+        features = self._extract_features(frame, self.active_groups, timestamp, state)
         if features is None:
             return False, 0.0
+        if self.feature_indices is not None:
+            features = features[self.feature_indices]
             
         features_scaled = self.scaler.transform([features])
         
@@ -490,19 +783,28 @@ class ViolenceDetector:
         confidence = self.model.predict_proba(features_scaled)[0][1]  # Probability of violence
         
         # Debug output (remove this later)
-        print(f"Raw confidence: {confidence:.3f}, Features sample: {features[:5]}")
+        if self.debug:
+            print(f"Raw confidence: {confidence:.3f}, Features sample: {features[:5]}")
         
-        # Apply lower threshold for better sensitivity
-        is_violent = confidence > 0.3  # Lowered from 0.6 to 0.3
+        # Apply lower threshold for better sensitivity (0.3 unless tuned by sweep_model.py)
+        is_violent = confidence > self.threshold
         
         return bool(is_violent), float(confidence)
     
-    def detect_violence_in_video(self, video_path):
+    def detect_violence_in_video(self, video_path, max_gap=1.0):
         """Detect violence in an uploaded video"""
-        results = []
-        
+        # Only the most recent samples are kept; the whole video is
+        # summarised by the event builder and confidence curve instead
+        recent_results = deque(maxlen=20)
+        events = EventBuilder(max_gap=max_gap)
+        curve = ConfidenceCurve()
+        
+        # Own motion history, so live frames analysed meanwhile don't mix in
+        state = self.new_motion_state()
         cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         frame_count = 0
+        total_analyzed = 0
         violent_frames = 0
         
         while cap.isOpened():
@@ -514,22 +816,28 @@ class ViolenceDetector:
             
             # Skip frames for faster processing (analyze every 10th frame)
             if frame_count % 10 == 0:
-                is_violent, confidence = self.detect_violence(frame)
+                timestamp = frame_count / fps
+                is_violent, confidence = self.detect_violence(frame, timestamp, state)
                 
-                results.append({
+                recent_results.append({
                     'frame': frame_count,
-                    'timestamp': frame_count / cap.get(cv2.CAP_PROP_FPS),
+                    'timestamp': timestamp,
                     'is_violent': is_violent,
                     'confidence': confidence
                 })
+                events.update(timestamp, is_violent, confidence)
+                curve.add(timestamp, confidence)
                 
+                total_analyzed += 1
                 if is_violent:
                     violent_frames += 1
+            elif frame_count % 10 == 9:
+                # Keep the preceding frame so motion is a one-frame difference
+                state.prev_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         cap.release()
         
         # Calculate overall statistics
-        total_analyzed = len(results)
         violence_percentage = (violent_frames / total_analyzed * 100) if total_analyzed > 0 else 0
         
         overall_result = {
@@ -538,7 +846,9 @@ class ViolenceDetector:
             'violent_frames': violent_frames,
             'violence_percentage': violence_percentage,
             'is_violent_video': violence_percentage > 30,  # Consider video violent if >30% frames are violent
-            'frame_results': results[-20:] if len(results) > 20 else results  # Return last 20 results
+            'frame_results': list(recent_results),  # Last 20 results
+            'events': events.finish(),
+            'confidence_curve': curve.to_dict()
         }
         
         return overall_result